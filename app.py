@@ -1,6 +1,10 @@
+import glob
+import hashlib
+import os
+import tempfile
+import numpy as np
 import pandas as pd
 import streamlit as st
-import altair as alt
 import requests
 
 st.title("The Evolution of Electric Vehicles in Washington State")
@@ -14,7 +18,42 @@ The analysis utilizes a series of interactive and contextual visualizations to p
         
 st.subheader("Electric Vehicle Population Dataset")
 st.markdown("[Access to the full dataset can be obtained here](https://catalog.data.gov/dataset/electric-vehicle-population-data)")
-data = pd.read_csv("Electric_Vehicle_Population_Data.csv")
+
+COLUMNS = ['Make', 'Electric Vehicle Type', 'Model Year', 'County', 'Electric Range']
+DTYPES = {'Model Year': 'Int16', 'Electric Range': 'float32'}
+CATEGORICAL_COLUMNS = ('Make', 'Electric Vehicle Type', 'County')
+
+@st.cache_data
+def load_data(path):
+    schema = hashlib.md5(repr((COLUMNS, DTYPES, CATEGORICAL_COLUMNS)).encode()).hexdigest()[:8]
+    stem = f"{os.path.splitext(path)[0]}-{schema}"
+    if not os.path.exists(path):
+        cached = sorted(glob.glob(glob.escape(stem) + '-*.parquet'), key=os.path.getmtime)
+        if cached:
+            return pd.read_parquet(cached[-1])
+
+    source = os.stat(path)
+    parquet_path = f"{stem}-{source.st_size}-{int(source.st_mtime)}.parquet"
+    if os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path)
+
+    df = pd.read_csv(path, engine='pyarrow', usecols=COLUMNS, dtype=DTYPES)
+    for c in CATEGORICAL_COLUMNS:
+        df[c] = df[c].astype('category')
+
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(parquet_path) or '.', prefix=os.path.basename(parquet_path) + '.', suffix='.tmp')
+        os.close(fd)
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, parquet_path)
+    except OSError:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df
+
+DATA_PATH = "Electric_Vehicle_Population_Data.csv"
+data = load_data(DATA_PATH)
 data
 
 # Interactive Visualization 1: Electric Vehicle Trends Over Time
@@ -24,48 +63,106 @@ The first visualization explores the growth of electric vehicles over the years,
 """ )
 st.markdown("Explores the growth of electric vehicles over the years.")
 
-selected_make = st.selectbox("Select Manufacturer", options=["All"] + list(data['Make'].unique()), index=0)
-selected_type = st.selectbox("Select Vehicle Type", options=["All"] + list(data['Electric Vehicle Type'].unique()), index=0)
+@st.cache_data
+def category_options(column):
+    return ["All"] + load_data(DATA_PATH)[column].cat.categories.tolist()
 
-filtered_data = data
-if selected_make != "All":
-    filtered_data = filtered_data[filtered_data['Make'] == selected_make]
-if selected_type != "All":
-    filtered_data = filtered_data[filtered_data['Electric Vehicle Type'] == selected_type]
-
-ev_count_by_year = filtered_data.groupby('Model Year').size().reset_index(name='Count')
-line_chart = alt.Chart(ev_count_by_year).mark_line(point=True).encode(
-    x='Model Year:N',
-    y='Count:Q',
-    tooltip=['Model Year', 'Count']
-).properties(
-    title=f"Growth of Electric Vehicles Over Time ({selected_make} - {selected_type})",
-    width=700,
-    height=400
-)
+selected_make = st.selectbox("Select Manufacturer", options=category_options('Make'), index=0)
+selected_type = st.selectbox("Select Vehicle Type", options=category_options('Electric Vehicle Type'), index=0)
+
+@st.cache_data
+def yearly_counts():
+    df = load_data(DATA_PATH)
+    grp = df.groupby(['Make', 'Electric Vehicle Type', 'Model Year'], observed=True).size()
+    return pd.DataFrame({
+        'Make': grp.index.get_level_values('Make'),
+        'Electric Vehicle Type': grp.index.get_level_values('Electric Vehicle Type'),
+        'Model Year': grp.index.get_level_values('Model Year'),
+        'Count': grp.values
+    })
+
+@st.cache_data
+def counts_by_year(selected_make, selected_type):
+    year_counts = yearly_counts()
+    if selected_make == "All" and selected_type == "All":
+        filtered_counts = year_counts
+    else:
+        mask = np.ones(len(year_counts), dtype=bool)
+        if selected_make != "All":
+            mask &= year_counts['Make'].cat.codes.values == year_counts['Make'].cat.categories.get_loc(selected_make)
+        if selected_type != "All":
+            mask &= year_counts['Electric Vehicle Type'].cat.codes.values == year_counts['Electric Vehicle Type'].cat.categories.get_loc(selected_type)
+        filtered_counts = year_counts.loc[mask]
+
+    first_year = int(year_counts['Model Year'].min())
+    years = filtered_counts['Model Year'].to_numpy(dtype=np.int32) - first_year
+    counts = np.bincount(years, weights=filtered_counts['Count'].to_numpy()).astype(np.int64)
+    present = np.flatnonzero(counts)
+    return pd.DataFrame({'Model Year': first_year + present, 'Count': counts[present]})
 
-st.altair_chart(line_chart, use_container_width=True)
+ev_count_by_year = counts_by_year(selected_make, selected_type)
+
+line_chart = {
+    "mark": {"type": "line", "point": True},
+    "encoding": {
+        "x": {"field": "Model Year", "type": "nominal"},
+        "y": {"field": "Count", "type": "quantitative"},
+        "tooltip": [
+            {"field": "Model Year", "type": "nominal"},
+            {"field": "Count", "type": "quantitative"}
+        ]
+    },
+    "title": f"Growth of Electric Vehicles Over Time ({selected_make} - {selected_type})",
+    "width": 700,
+    "height": 400
+}
+
+st.vega_lite_chart(ev_count_by_year, line_chart, use_container_width=True)
 
 # Interactive Visualization: Electric Range Distribution
 st.subheader("Electric Range Distribution")
 st.markdown("Analyzes the distribution of electric ranges for all vehicles or specific types.")
 
-range_filtered_data = data
+@st.cache_data
+def range_histogram_counts(maxbins=20):
+    df = load_data(DATA_PATH)
+    max_range = df['Electric Range'].max()
+    step = max(np.ceil(max_range / maxbins / 10) * 10, 10)
+    n_bins = max(int(np.ceil(max_range / step)), 1)
+    # Left-closed [start, end) bins like Vega's bin transform; the maximum falls in the last bin.
+    bin_index = np.minimum(np.floor(df['Electric Range'] / step), n_bins - 1)
+    grp = df.groupby([bin_index, df['Electric Vehicle Type']], observed=True).size()
+    range_start = grp.index.get_level_values(0).to_numpy() * step
+    return pd.DataFrame({
+        'Electric Vehicle Type': grp.index.get_level_values(1),
+        'Count': grp.values,
+        'Range Start': range_start,
+        'Range End': range_start + step
+    })
+
+range_counts = range_histogram_counts()
 if selected_type != "All":
-    range_filtered_data = range_filtered_data[range_filtered_data['Electric Vehicle Type'] == selected_type]
-
-range_histogram = alt.Chart(range_filtered_data).mark_bar().encode(
-    x=alt.X('Electric Range:Q', bin=alt.Bin(maxbins=20), title="Electric Range (miles)"),
-    y=alt.Y('count()', title="Number of Vehicles"),
-    tooltip=['Electric Range', 'count()'],
-    color=alt.Color('Electric Vehicle Type:N', title="Vehicle Type")
-).properties(
-    title="Distribution of Electric Range by Vehicle Type",
-    width=700,
-    height=400
-)
+    range_counts = range_counts[range_counts['Electric Vehicle Type'] == selected_type]
+
+range_histogram = {
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "Range Start", "type": "quantitative", "bin": "binned", "title": "Electric Range (miles)"},
+        "x2": {"field": "Range End"},
+        "y": {"field": "Count", "type": "quantitative", "title": "Number of Vehicles"},
+        "tooltip": [
+            {"field": "Range Start", "type": "quantitative", "format": ".0f"},
+            {"field": "Range End", "type": "quantitative", "format": ".0f"},
+            {"field": "Count", "type": "quantitative"}
+        ],
+        "color": {"field": "Electric Vehicle Type", "type": "nominal", "title": "Vehicle Type"}
+    },
+    "title": "Distribution of Electric Range by Vehicle Type",
+    "width": 700,
+    "height": 400
+}
 
-st.altair_chart(range_histogram, use_container_width=True)
+st.vega_lite_chart(range_counts, range_histogram, use_container_width=True)
 
 st.subheader("Contextual Visualizations")
 st.text(""" 
@@ -77,51 +174,82 @@ st.markdown("""
 Explores the distribution of electric vehicles across Washington State counties.
 """)
 
-bins = [0, 50, 200, 500, 1000, data['County'].value_counts().max()]
 labels = ["0-50", "51-200", "201-500", "501-1000", "1000+"]
-data['Adoption Range'] = pd.cut(data['County'].map(data['County'].value_counts()), bins=bins, labels=labels, include_lowest=True)
 selected_range = st.selectbox("Select an EV adoption range:", options=["All"] + labels)
 
-filtered_county_data = data if selected_range == "All" else data[data['Adoption Range'] == selected_range]
-
-county_counts = filtered_county_data['County'].value_counts().reset_index()
-county_counts.columns = ['County', 'Count']
-
-county_bar_chart = alt.Chart(county_counts).mark_bar().encode(
-    x=alt.X('Count:Q', title='Number of Vehicles'),
-    y=alt.Y('County:N', title='County', sort='-x'),
-    tooltip=['County', 'Count'],
-    color=alt.Color('Count:Q', scale=alt.Scale(scheme='bluegreen', domain=[0, county_counts['Count'].max()])),
-).properties(
-    title="Electric Vehicle Distribution Across Counties",
-    width=800,
-    height=500
-).configure_axis(
-    labelFontSize=12,
-    titleFontSize=14
-).configure_title(
-    fontSize=16
-)
+@st.cache_data
+def county_chart_data(selected_range):
+    df = load_data(DATA_PATH)
+    codes = df['County'].cat.codes.values
+    counts = np.bincount(codes[codes >= 0], minlength=len(df['County'].cat.categories))
+    county_counts = pd.DataFrame({'County': df['County'].cat.categories, 'Count': counts})
+    county_counts = county_counts[county_counts['Count'] > 0].reset_index(drop=True)
+    if selected_range != "All":
+        bins = [0, 50, 200, 500, 1000, county_counts['Count'].max()]
+        adoption_range = pd.cut(county_counts['Count'], bins=bins, labels=labels, include_lowest=True)
+        county_counts = county_counts[adoption_range == selected_range]
+    return county_counts
+
+county_counts = county_chart_data(selected_range)
+
+county_bar_chart = {
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "Count", "type": "quantitative", "title": "Number of Vehicles"},
+        "y": {"field": "County", "type": "nominal", "title": "County", "sort": "-x"},
+        "tooltip": [
+            {"field": "County", "type": "nominal"},
+            {"field": "Count", "type": "quantitative"}
+        ],
+        "color": {
+            "field": "Count",
+            "type": "quantitative",
+            "scale": {"scheme": "bluegreen", "domain": [0, int(county_counts['Count'].max())]}
+        }
+    },
+    "title": "Electric Vehicle Distribution Across Counties",
+    "width": 800,
+    "height": 500,
+    "config": {
+        "axis": {"labelFontSize": 12, "titleFontSize": 14},
+        "title": {"fontSize": 16}
+    }
+}
 
-st.altair_chart(county_bar_chart, use_container_width=True)
+st.vega_lite_chart(county_counts, county_bar_chart, use_container_width=True)
 
 # Contextual Visualization: Average Electric Range by Manufacturer
 st.subheader("Average Electric Range by Manufacturer")
 st.markdown("Explores which manufacturers offer the highest average electric ranges for their vehicles.")
 
-avg_range_by_make = data.groupby('Make')['Electric Range'].mean().reset_index().sort_values('Electric Range', ascending=False).head(10)
-avg_range_chart = alt.Chart(avg_range_by_make).mark_bar().encode(
-    x=alt.X('Electric Range:Q', title='Average Electric Range (miles)'),
-    y=alt.Y('Make:N', title='Manufacturer', sort='-x'),
-    tooltip=['Make', 'Electric Range'],
-    color=alt.Color('Electric Range:Q', scale=alt.Scale(scheme='plasma'))
-).properties(
-    title="Top 10 Manufacturers by Average Electric Range",
-    width=700,
-    height=400
-)
+@st.cache_data
+def avg_range_data():
+    df = load_data(DATA_PATH)
+    mean_range = df.groupby('Make', observed=True)['Electric Range'].mean()
+    means = mean_range.values
+    k = min(10, len(means))
+    top = np.argpartition(-means, k - 1)[:k]
+    top = top[np.argsort(-means[top])]
+    return pd.DataFrame({'Make': mean_range.index.values[top], 'Electric Range': means[top]})
+
+avg_range_by_make = avg_range_data()
+avg_range_chart = {
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "Electric Range", "type": "quantitative", "title": "Average Electric Range (miles)"},
+        "y": {"field": "Make", "type": "nominal", "title": "Manufacturer", "sort": "-x"},
+        "tooltip": [
+            {"field": "Make", "type": "nominal"},
+            {"field": "Electric Range", "type": "quantitative"}
+        ],
+        "color": {"field": "Electric Range", "type": "quantitative", "scale": {"scheme": "plasma"}}
+    },
+    "title": "Top 10 Manufacturers by Average Electric Range",
+    "width": 700,
+    "height": 400
+}
 
-st.altair_chart(avg_range_chart, use_container_width=True)
+st.vega_lite_chart(avg_range_by_make, avg_range_chart, use_container_width=True)
 
 # Adding an Image
 st.subheader("Map of Electric Vehicle Charging Stations in Washington")